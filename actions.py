@@ -7,7 +7,11 @@ from game_state import angle_diff, distance, movement_modifier
 def turn_ship(ship, desired_heading):
     """
     Apply heading change, respecting ship.handling.
+    Raises ValueError for a non-finite heading (e.g. float("nan")).
     """
+    if not math.isfinite(desired_heading):
+        raise ValueError(f"heading must be finite, got {desired_heading!r}")
+
     # normalize:
     desired_heading = desired_heading % 360
 
@@ -24,24 +28,29 @@ def turn_ship(ship, desired_heading):
     return diff  # how much we actually turned
 
 
-def move_ship(ship, game_state, sail_setting=None):
+def effective_speed(ship, game_state, sail_setting=None):
     """
-    Move ship forward based on:
-    - base_speed
-    - sail_setting
-    - rigging health
-    - wind angle
-    For milestone 1, we keep it simple:
+    Distance the ship would cover in one move:
       effective_speed = base_speed * sail_mult * rigging_mult * wind_mult
+    sail_setting defaults to the ship's current setting.
     """
     # sail_setting impact
     # battle sail = stable gun platform, slower
     # full sail   = faster, maybe penalty to gunnery later
-    # default to ship's current setting unless overridden
+    # wind impact
+    rel_angle = angle_diff(ship.heading, game_state.wind_dir)
+    wind_mult = movement_modifier(rel_angle)
+
+    return best_speed(ship, sail_setting) * wind_mult
+
+
+def best_speed(ship, sail_setting=None):
+    """
+    effective_speed with the wind on the beam: the fastest the ship can go
+    on any heading with its current rigging.
+    """
     if sail_setting is None:
         sail_setting = getattr(ship, "sail_setting", "battle")
-    else:
-        ship.sail_setting = sail_setting
 
     if sail_setting == "full":
         sail_mult = 1.2
@@ -51,20 +60,32 @@ def move_ship(ship, game_state, sail_setting=None):
     # rigging damage slows you
     rigging_mult = max(0.2, ship.rigging / ship.rigging_max)
 
-    # wind impact
-    rel_angle = angle_diff(ship.heading, game_state.wind_dir)
-    wind_mult = movement_modifier(rel_angle)
+    return ship.base_speed * sail_mult * rigging_mult * movement_modifier(90)
+
+
+def move_ship(ship, game_state, sail_setting=None):
+    """
+    Move ship forward based on:
+    - base_speed
+    - sail_setting
+    - rigging health
+    - wind angle
+    See effective_speed for the formula.
+    """
+    # default to ship's current setting unless overridden
+    if sail_setting is not None:
+        ship.sail_setting = sail_setting
 
-    effective_speed = ship.base_speed * sail_mult * rigging_mult * wind_mult
+    speed = effective_speed(ship, game_state)
 
     # move in heading direction
     rad = math.radians(ship.heading)
-    dx = math.cos(rad) * effective_speed
-    dy = math.sin(rad) * effective_speed
+    dx = math.cos(rad) * speed
+    dy = math.sin(rad) * speed
     ship.x += dx
     ship.y += dy
 
-    return effective_speed, dx, dy
+    return speed, dx, dy
 
 
 # COMBAT
@@ -200,6 +221,7 @@ def fire_broadside(attacker, defender, preferred_side=None):
     # After firing, guns are unloaded and must be reloaded before next shot
     if hasattr(attacker, "loaded_ammo"):
         attacker.loaded_ammo = None
+    attacker.broadsides_fired += 1
 
     if sunk:
         summary += f"\n{defender.name} is sinking!"
@@ -0,0 +1,188 @@
+import math
+import random
+from types import SimpleNamespace
+
+from actions import turn_ship, move_ship, fire_broadside, best_speed
+from game_state import distance
+
+# ENGAGEMENT CLUSTERS
+#
+# Ships that cannot come within gun range of each other during a turn cannot
+# affect each other, so a turn's orders can be resolved one group at a time.
+# Each group gets its own RNG stream seeded from (seed, turn, lowest slot), so
+# the outcome does not depend on how many workers run or in what order.
+#
+# Orders are tuples led by the acting ship's slot (its index in game.ships):
+#   (slot, "turn", heading)
+#   (slot, "move") / (slot, "move", "battle"|"full")
+#   (slot, "load") / (slot, "load", "round"|"chain"|"double")
+#   (slot, "fire", target_slot) / (slot, "fire", target_slot, "port"|"starboard")
+# Each order costs 1 AP, as in the interactive game.
+
+MAX_RANGE = 8.0   # fire_broadside is out of range from 8 units
+
+# Ship attributes an order can change; copied back after resolving a cluster
+STATE_FIELDS = (
+    "x", "y", "heading",
+    "hull", "rigging", "crew",
+    "alive", "surrendered",
+    "sail_setting", "ammo_type", "loaded_ammo",
+    "ap", "broadsides_fired",
+)
+
+
+def turn_reach(ship) -> float:
+    """Furthest the ship could sail on its remaining AP (full sail, best wind)."""
+    return max(ship.ap, 0) * best_speed(ship, "full")
+
+
+def engagement_clusters(game, orders=()):
+    """
+    Split game.ships into groups (lists of slots) that cannot interact this
+    turn: two living ships are linked if their remaining movement could bring
+    them within MAX_RANGE, and an attacker is always grouped with its ordered
+    target. Groups are connected components, sorted by lowest slot.
+
+    Uses a uniform grid with cells as wide as the longest possible link, so
+    only neighbouring cells are compared.
+    """
+    n = len(game.ships)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(a, b):
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+
+    living = [s for s in game.ships if s.alive and not s.surrendered and not s.is_sunk()]
+    reach = {s.slot: turn_reach(s) for s in living}
+    cell = MAX_RANGE + 2 * max(reach.values(), default=0.0)
+
+    grid = {}
+    for s in living:
+        grid.setdefault((math.floor(s.x / cell), math.floor(s.y / cell)), []).append(s)
+
+    for (cx, cy), here in grid.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                there = grid.get((cx + dx, cy + dy))
+                if not there:
+                    continue
+                for a in here:
+                    for b in there:
+                        if a.slot >= b.slot:
+                            continue
+                        limit = MAX_RANGE + reach[a.slot] + reach[b.slot]
+                        if distance((a.x, a.y), (b.x, b.y)) <= limit:
+                            union(a.slot, b.slot)
+
+    for order in orders:
+        if order[1] == "fire":
+            union(order[0], order[2])
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [groups[root] for root in sorted(groups)]
+
+
+def execute_order(ships, sea, order):
+    """
+    Carry out one order against `ships` ({slot: Ship}); `sea` supplies
+    wind_dir for movement. Returns a message like the interactive game prints.
+    """
+    slot, verb, *args = order
+    ship = ships[slot]
+    if not ship.alive or ship.surrendered or ship.is_sunk():
+        return f"{ship.name} cannot act."
+    if ship.ap <= 0:
+        return f"{ship.name} has no AP left."
+
+    if verb == "turn":
+        change = turn_ship(ship, args[0])
+        msg = f"{ship.name} turned {change:.1f} deg. New heading {ship.heading:.1f} deg."
+    elif verb == "move":
+        spd, dx, dy = move_ship(ship, sea, sail_setting=args[0] if args else None)
+        msg = (f"{ship.name} moved ({dx:.2f},{dy:.2f}) at effective speed {spd:.2f}. "
+               f"Now at ({ship.x:.2f},{ship.y:.2f}).")
+    elif verb == "load":
+        ship.loaded_ammo = args[0] if args else ship.ammo_type
+        msg = f"{ship.name} loaded {ship.loaded_ammo}."
+    elif verb == "fire":
+        if ship.loaded_ammo is None:
+            return f"{ship.name}'s guns are unloaded."
+        side = args[1] if len(args) > 1 else None
+        msg = fire_broadside(ship, ships[args[0]], preferred_side=side)
+    else:
+        raise ValueError(f"Unknown order {verb!r}")
+
+    ship.ap = max(0, ship.ap - 1)
+    return msg
+
+
+def cluster_seed(seed, turn_number, slots):
+    return f"{seed}:{turn_number}:{min(slots)}"
+
+
+def resolve_cluster(ships, wind_dir, orders, seed):
+    """
+    Resolve one cluster's orders ([(index, order)]) on `ships` ({slot: Ship}).
+    Runs in a worker process, so it seeds and uses the process-wide `random`
+    that actions.py draws from. Returns ({slot: {field: value}}, [(index, msg)]).
+    """
+    random.seed(seed)
+    sea = SimpleNamespace(wind_dir=wind_dir)
+    messages = [(i, execute_order(ships, sea, order)) for i, order in orders]
+    states = {slot: {f: getattr(s, f) for f in STATE_FIELDS} for slot, s in ships.items()}
+    return states, messages
+
+
+def resolve_turn(game, orders, seed=0, executor=None):
+    """
+    Resolve a turn's orders cluster by cluster and return their messages in
+    order. With a concurrent.futures executor (e.g. ProcessPoolExecutor) each
+    cluster runs as its own task; without one they run here, one after the
+    other. Both give identical results for the same seed.
+    """
+    clusters = engagement_clusters(game, orders)
+    owner = {slot: k for k, slots in enumerate(clusters) for slot in slots}
+    per_cluster = [[] for _ in clusters]
+    for i, order in enumerate(orders):
+        per_cluster[owner[order[0]]].append((i, order))
+
+    jobs = [(slots, todo) for slots, todo in zip(clusters, per_cluster) if todo]
+    results = []
+    if executor is None:
+        saved = random.getstate()
+        try:
+            for slots, todo in jobs:
+                ships = {slot: game.ships[slot] for slot in slots}
+                seed_k = cluster_seed(seed, game.turn_number, slots)
+                results.append(resolve_cluster(ships, game.wind_dir, todo, seed_k))
+        finally:
+            random.setstate(saved)
+    else:
+        futures = [
+            executor.submit(resolve_cluster,
+                            {slot: game.ships[slot] for slot in slots},
+                            game.wind_dir, todo,
+                            cluster_seed(seed, game.turn_number, slots))
+            for slots, todo in jobs
+        ]
+        results = [f.result() for f in futures]
+
+    messages = []
+    for states, msgs in results:
+        for slot, fields in states.items():
+            ship = game.ships[slot]
+            for f, value in fields.items():
+                setattr(ship, f, value)
+        messages.extend(msgs)
+    messages.sort()
+    return [msg for _, msg in messages]
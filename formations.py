@@ -0,0 +1,181 @@
+import math
+from game_state import angle_diff, distance
+from actions import turn_ship, move_ship, effective_speed, best_speed
+
+# FLEET ORDERS
+#
+# A squadron order gives every member with AP left one action (a turn or a
+# move, 1 AP each) in a single call, processed leader-first so each follower
+# keeps station on where the ship ahead has just got to. Each order is O(n) in
+# squadron size.
+
+HEADING_TOLERANCE = 2.0   # deg off course we still count as "on course"
+STATION_TOLERANCE = 0.5   # units off station we still count as "on station"
+
+
+def _bearing(src, point):
+    return math.degrees(math.atan2(point[1] - src.y, point[0] - src.x)) % 360
+
+
+def _offset(ship, heading, dist):
+    rad = math.radians(heading)
+    return (ship.x + math.cos(rad) * dist, ship.y + math.sin(rad) * dist)
+
+
+class Squadron:
+    """
+    An ordered group of ships taking fleet orders together.
+    ships[0] is the leader; every other ship keeps station on the one ahead.
+    """
+
+    def __init__(self, ships, spacing: float = 2.0):
+        self.ships = list(ships)
+        self.spacing = spacing
+        # (x, y, heading) where the leader wheeled for turn_in_succession
+        self.wheel = None
+
+    def members(self):
+        return [s for s in self.ships if s.alive and not s.surrendered and not s.is_sunk()]
+
+    # -- single-ship steps --
+
+    def _act(self, ship, game, action, report, **kw):
+        if action == "turn":
+            report.append((ship, "turn", turn_ship(ship, kw["heading"])))
+        elif action == "move":
+            spd, _, _ = move_ship(ship, game, sail_setting=kw.get("sail"))
+            report.append((ship, "move", spd))
+        ship.ap = max(0, ship.ap - 1)
+
+    def _steer(self, ship, game, heading, report, dist=None):
+        """
+        Turn toward heading if off course, otherwise move. When dist is given,
+        pick the sail setting whose wind-limited speed best covers it, and hold
+        instead of moving if even battle sail would overshoot.
+        """
+        if angle_diff(ship.heading, heading) > HEADING_TOLERANCE:
+            self._act(ship, game, "turn", report, heading=heading)
+            return
+        sail = None
+        if dist is not None:
+            speeds = {s: effective_speed(ship, game, s) for s in ("battle", "full")}
+            if dist < speeds["battle"] / 2:
+                report.append((ship, "hold", 0.0))
+                return
+            sail = min(speeds, key=lambda s: abs(speeds[s] - dist))
+        self._act(ship, game, "move", report, sail=sail)
+
+    def _close_enough(self, ship, dist):
+        # within half a battle-sail move there is nothing better to steer for.
+        # Uses the best-case speed so the answer doesn't flip as the ship
+        # turns through wind sectors.
+        return dist <= max(STATION_TOLERANCE, best_speed(ship, "battle") / 2)
+
+    def _keep_station(self, ship, game, station, heading, report):
+        dist = distance((ship.x, ship.y), station)
+        if self._close_enough(ship, dist):
+            self._steer(ship, game, heading, report, dist=dist)
+        else:
+            self._steer(ship, game, _bearing(ship, station), report, dist=dist)
+
+    def _order(self, game, step):
+        """Run step(index, ship, report) for every member with AP left."""
+        report = []
+        for i, s in enumerate(self.members()):
+            if s.ap > 0:
+                step(i, s, report)
+        return report
+
+    # -- orders --
+
+    def line_ahead(self, game):
+        """Leader holds course; each ship sails `spacing` astern of the one ahead."""
+        members = self.members()
+
+        def step(i, s, report):
+            if i == 0:
+                self._steer(s, game, s.heading, report)
+                return
+            ahead = members[i - 1]
+            station = _offset(ahead, ahead.heading + 180, self.spacing)
+            self._keep_station(s, game, station, ahead.heading, report)
+
+        return self._order(game, step)
+
+    def line_abreast(self, game):
+        """
+        Leader holds course; the others form up on its starboard beam. The
+        leader waits while any follower is still out of position: a follower
+        spends actions turning between its station and the leader's course,
+        so at equal speed it would never catch a leader that kept sailing.
+        """
+        members = self.members()
+        leader = members[0] if members else None
+
+        def station(i):
+            return _offset(leader, leader.heading - 90, self.spacing * i)
+
+        def step(i, s, report):
+            if i == 0:
+                if any(not self._close_enough(f, distance((f.x, f.y), station(j)))
+                       for j, f in enumerate(members) if j):
+                    report.append((s, "hold", 0.0))
+                else:
+                    self._steer(s, game, s.heading, report)
+                return
+            self._keep_station(s, game, station(i), leader.heading, report)
+
+        return self._order(game, step)
+
+    def follow_leader(self, game):
+        """Each ship steers straight for the one ahead, closing to `spacing`."""
+        members = self.members()
+
+        def step(i, s, report):
+            if i == 0:
+                self._steer(s, game, s.heading, report)
+                return
+            ahead = members[i - 1]
+            gap = distance((s.x, s.y), (ahead.x, ahead.y)) - self.spacing
+            if gap <= STATION_TOLERANCE:
+                report.append((s, "hold", 0.0))
+                return
+            self._steer(s, game, _bearing(s, (ahead.x, ahead.y)), report, dist=gap)
+
+        return self._order(game, step)
+
+    def turn_together(self, game, heading):
+        """Every ship turns toward heading at once (limited by its handling)."""
+        heading = heading % 360
+        return self._order(
+            game, lambda i, s, report: self._act(s, game, "turn", report, heading=heading))
+
+    def turn_in_succession(self, game, heading):
+        """
+        The leader turns toward heading; the others hold course until they
+        reach the point where it wheeled, then turn there in their turn.
+        Repeat the order until every ship is round.
+        """
+        heading = heading % 360
+        members = self.members()
+        if not members:
+            return []
+        leader = members[0]
+        if self.wheel is None or self.wheel[2] != heading:
+            self.wheel = (leader.x, leader.y, heading)
+        wheel = self.wheel[:2]
+
+        def step(i, s, report):
+            if i == 0 or angle_diff(s.heading, heading) <= HEADING_TOLERANCE:
+                self._steer(s, game, heading, report)
+                return
+            dist = distance((s.x, s.y), wheel)
+            if self._close_enough(s, dist):
+                self._act(s, game, "turn", report, heading=heading)
+            else:
+                self._steer(s, game, _bearing(s, wheel), report, dist=dist)
+
+        report = self._order(game, step)
+        if all(angle_diff(s.heading, heading) <= HEADING_TOLERANCE for s in members):
+            self.wheel = None
+        return report
@@ -1,5 +1,8 @@
 import math
 import random
+import weakref
+
+import zobrist
 
 # -----------------
 # Constants / helpers
@@ -48,6 +51,10 @@ def distance(a, b):
 # Ship / GameState
 # -----------------
 
+# Ship attributes that change where (or whether) a ship shows on the map;
+# writes to these are reported to GameState.watchers
+VISIBLE_FIELDS = frozenset(("x", "y", "heading", "hull", "alive", "surrendered"))
+
 
 class Ship:
     """
@@ -101,10 +108,42 @@ class Ship:
         self.ammo_type = "round"       # preferred type when loading
         self.loaded_ammo = None         # currently loaded: None requires loading
 
+        # Battle record
+        self.broadsides_fired = 0
+
         # Action Points per turn
         self.ap_max = 4
         self.ap = 0
 
+        # Owning GameState, index in its ship list and current Zobrist field
+        # keys (set by GameState)
+        self.state = None
+        self.slot = None
+        self._zkeys = None
+
+    def __setattr__(self, name, value):
+        # keep the owning GameState's Zobrist hash in step with hashed fields
+        # (_zkeys caches each field's current key, so only the new one is computed)
+        state = self.__dict__.get("state")
+        if state is not None and name in zobrist.FIELD_KEYERS:
+            # key first: if the value can't be quantized nothing is written
+            new = zobrist.FIELD_KEYERS[name](self, value)
+            object.__setattr__(self, name, value)
+            keys = self._zkeys
+            state.zhash ^= keys[name] ^ new
+            keys[name] = new
+            if state.watchers and name in VISIBLE_FIELDS:
+                for w in state.watchers:
+                    w.touched.add(self)
+        else:
+            object.__setattr__(self, name, value)
+
+    def __getstate__(self):
+        # don't drag the whole GameState along when pickling a single ship
+        d = dict(self.__dict__)
+        d["state"] = None
+        return d
+
     def is_sunk(self):
         return self.hull <= 0
 
@@ -143,6 +182,10 @@ class Ship:
 class GameState:
     """
     Holds everything about the battle.
+
+    Ships joining after construction must come in through add_ship so they
+    get a slot and take part in the Zobrist hash; appending to `ships`
+    directly leaves zhash out of step.
     """
 
     def __init__(self, ships, wind_dir=90, wind_speed=10):
@@ -150,10 +193,53 @@ class GameState:
         # Heading convention: 0 = east, 90 = north, 180 = west, 270 = south.
         # For milestone 1 we use wind_dir abstractly for movement math.
         self.ships = ships
-        self.turn_number = 1
+        self._turn_number = 1
         self.wind_dir = wind_dir      # 0-359
         self.wind_speed = wind_speed  # abstract, affects speed maybe later
 
+        # Zobrist hash of ships + turn, updated incrementally (see zobrist.py)
+        for i, s in enumerate(ships):
+            s.slot = i
+            s._zkeys = zobrist.field_keys(s)
+        self.zhash = zobrist.hash_state(self)
+        for s in ships:
+            s.state = self
+
+        # objects with a `touched` set that hear about every ship whose
+        # VISIBLE_FIELDS change (e.g. MapRenderer); held weakly
+        self.watchers = weakref.WeakSet()
+
+    def __getstate__(self):
+        d = dict(self.__dict__)
+        del d["watchers"]
+        return d
+
+    def __setstate__(self, d):
+        # ships drop their back-reference when pickled/copied; restore it
+        self.__dict__.update(d)
+        self.watchers = weakref.WeakSet()
+        for s in self.ships:
+            s.state = self
+
+    def add_ship(self, ship):
+        """Append a ship mid-battle and fold it into zhash."""
+        ship.slot = len(self.ships)
+        self.ships.append(ship)
+        ship._zkeys = zobrist.field_keys(ship)
+        self.zhash ^= zobrist.ship_key(ship)
+        ship.state = self
+        for w in self.watchers:
+            w.touched.add(ship)
+
+    @property
+    def turn_number(self):
+        return self._turn_number
+
+    @turn_number.setter
+    def turn_number(self, value):
+        self.zhash ^= zobrist.turn_key(self._turn_number) ^ zobrist.turn_key(value)
+        self._turn_number = value
+
     def living_ships(self):
         return [s for s in self.ships if s.alive and not s.surrendered and not s.is_sunk()]
 
@@ -0,0 +1,146 @@
+from contextlib import contextmanager
+
+# UNDO / REDO
+#
+# History is a tree of steps. Each step stores only the (ship, field, old, new)
+# values its action changed, so memory grows with actions taken, not with
+# fleet size. Undo writes the old values back and redo writes the new ones.
+# Taking a new action after an undo starts a new branch instead of discarding
+# the old one, and named branch points let a player jump between alternatives.
+
+# Fields each kind of action can change (AP included: every action costs 1)
+TURN_FIELDS = ("heading", "ap")
+MOVE_FIELDS = ("x", "y", "sail_setting", "ap")
+FIRE_FIELDS = ("hull", "rigging", "crew", "alive", "surrendered", "loaded_ammo", "ap",
+               "broadsides_fired")
+LOAD_FIELDS = ("loaded_ammo", "ap")
+SAIL_FIELDS = ("sail_setting", "ap")
+# a squadron order turns or moves each member
+SQUADRON_FIELDS = tuple(dict.fromkeys(TURN_FIELDS + MOVE_FIELDS))
+
+
+class Step:
+    __slots__ = ("parent", "label", "changes", "children", "last")
+
+    def __init__(self, parent, label, changes):
+        self.parent = parent
+        self.label = label
+        self.changes = changes      # [(ship, field, old, new)]
+        self.children = []
+        self.last = None            # child that redo() returns to
+
+    def path(self):
+        """Steps from the root (exclusive) down to this one."""
+        steps = []
+        node = self
+        while node.parent is not None:
+            steps.append(node)
+            node = node.parent
+        return steps[::-1]
+
+
+class History:
+    def __init__(self):
+        self.root = Step(None, "start", [])
+        self.current = self.root
+        self.branches = {}
+
+    # -- recording --
+
+    @contextmanager
+    def record(self, label, watched):
+        """
+        Record whatever the body changes in `watched`, a list of
+        (ship, fields) pairs. Nothing is recorded if nothing changed.
+        """
+        before = [(ship, f, getattr(ship, f)) for ship, fields in watched for f in fields]
+        yield
+        changes = [(ship, f, old, getattr(ship, f))
+                   for ship, f, old in before if getattr(ship, f) != old]
+        if changes:
+            step = Step(self.current, label, changes)
+            self.current.children.append(step)
+            self.current.last = step
+            self.current = step
+
+    # -- navigation --
+
+    def _apply(self, step, forward):
+        if forward:
+            for ship, f, _, new in step.changes:
+                setattr(ship, f, new)
+        else:
+            for ship, f, old, _ in reversed(step.changes):
+                setattr(ship, f, old)
+
+    def can_undo(self):
+        return self.current.parent is not None
+
+    def can_redo(self):
+        return self.current.last is not None
+
+    def undo(self):
+        """Take back the last step; returns its label, or None at the start."""
+        step = self.current
+        if step.parent is None:
+            return None
+        self._apply(step, forward=False)
+        step.parent.last = step
+        self.current = step.parent
+        return step.label
+
+    def redo(self):
+        """Re-apply the step last undone from here; returns its label or None."""
+        step = self.current.last
+        if step is None:
+            return None
+        self._apply(step, forward=True)
+        self.current = step
+        return step.label
+
+    def mark(self, name):
+        """Name the current point so it can be returned to with checkout()."""
+        self.branches[name] = self.current
+
+    def checkout(self, name):
+        """Undo/redo along the tree until the game is at branch point `name`."""
+        target = self.branches[name]
+        on_path = set(map(id, target.path())) | {id(self.root)}
+        while id(self.current) not in on_path:
+            self.undo()
+        path = target.path()
+        start = path.index(self.current) + 1 if self.current is not self.root else 0
+        for step in path[start:]:
+            self.current.last = step
+            self.redo()
+
+    def compare(self, a, b):
+        """
+        Fields that differ between branch points a and b, worked out from the
+        recorded steps without touching the game:
+        {(ship name, field): (value at a, value at b)}
+        """
+        path_a = self.branches[a].path()
+        path_b = self.branches[b].path()
+        common = 0
+        while (common < len(path_a) and common < len(path_b)
+               and path_a[common] is path_b[common]):
+            common += 1
+
+        def net(steps):
+            out = {}
+            for step in steps:
+                for ship, f, old, new in step.changes:
+                    key = (ship, f)
+                    out[key] = (out[key][0] if key in out else old, new)
+            return out
+
+        net_a, net_b = net(path_a[common:]), net(path_b[common:])
+        diffs = {}
+        for key in net_a.keys() | net_b.keys():
+            base = (net_a.get(key) or net_b.get(key))[0]
+            va = net_a[key][1] if key in net_a else base
+            vb = net_b[key][1] if key in net_b else base
+            if va != vb:
+                diffs[(key[0].name, key[1])] = (va, vb)
+        return dict(sorted(diffs.items()))
@@ -1,24 +1,10 @@
+import math
 from game_state import Ship, GameState
 from actions import turn_ship, move_ship, fire_broadside, bearing_from_to
-
-
-def _heading_arrow(deg: float) -> str:
-    d = deg % 360
-    if 337.5 <= d or d < 22.5:
-        return ">"
-    if 22.5 <= d < 67.5:
-        return "/"
-    if 67.5 <= d < 112.5:
-        return "^"
-    if 112.5 <= d < 157.5:
-        return "\\"
-    if 157.5 <= d < 202.5:
-        return "<"
-    if 202.5 <= d < 247.5:
-        return "/"
-    if 247.5 <= d < 292.5:
-        return "v"
-    return "\\"
+from formations import Squadron
+from render import Viewport, MapRenderer
+from history import (History, TURN_FIELDS, MOVE_FIELDS, FIRE_FIELDS, LOAD_FIELDS, SAIL_FIELDS,
+                     SQUADRON_FIELDS)
 
 
 def render_ascii_map(game: GameState, width: int = 31, height: int = 15) -> str:
@@ -26,80 +12,10 @@ def render_ascii_map(game: GameState, width: int = 31, height: int = 15) -> str:
     if not ships:
         return "[No ships]"
 
-    min_x = min(s.x for s in ships)
-    max_x = max(s.x for s in ships)
-    min_y = min(s.y for s in ships)
-    max_y = max(s.y for s in ships)
-
-    # pad bounds so ships near edges are visible
-    pad = 1.0
-    min_x -= pad
-    max_x += pad
-    min_y -= pad
-    max_y += pad
-
-    span_x = max(1e-6, max_x - min_x)
-    span_y = max(1e-6, max_y - min_y)
-
-    grid = [[" "] * width for _ in range(height)]
-
-    # place ships (and remember their cells for heading arrows)
-    taken = {}
-    positions = {}
-    for s in ships:
-        col = int(round((s.x - min_x) / span_x * (width - 1)))
-        row = int(round((s.y - min_y) / span_y * (height - 1)))
-        row = (height - 1) - row  # y up -> top row
-        col = max(0, min(width - 1, col))
-        row = max(0, min(height - 1, row))
-
-        key = (row, col)
-        if key in taken:
-            grid[row][col] = "*"  # collision marker
-        else:
-            sym = s.name[0].upper()
-            grid[row][col] = sym
-            taken[key] = s
-            positions[s] = (row, col)
-
-    # draw heading arrows in adjacent cells when available
-    def _heading_offset(deg: float):
-        d = deg % 360
-        if 337.5 <= d or d < 22.5:   # E
-            return (0, 1)
-        if 22.5 <= d < 67.5:         # NE
-            return (-1, 1)
-        if 67.5 <= d < 112.5:        # N
-            return (-1, 0)
-        if 112.5 <= d < 157.5:       # NW
-            return (-1, -1)
-        if 157.5 <= d < 202.5:       # W
-            return (0, -1)
-        if 202.5 <= d < 247.5:       # SW
-            return (1, -1)
-        if 247.5 <= d < 292.5:       # S
-            return (1, 0)
-        return (1, 1)                 # SE
-
-    for s, (row, col) in positions.items():
-        dr, dc = _heading_offset(s.heading)
-        ar, ac = row + dr, col + dc
-        if 0 <= ar < height and 0 <= ac < width and grid[ar][ac] == " ":
-            grid[ar][ac] = _heading_arrow(s.heading)
-
-    lines = []
-    lines.append(f"Wind from {game.wind_dir} deg")
-    lines.append("+" + ("-" * width) + "+")
-    for r in range(height):
-        lines.append("|" + "".join(grid[r]) + "|")
-    lines.append("+" + ("-" * width) + "+")
-
-    # legend
-    for s in ships:
-        lines.append(
-            f" {s.name[0].upper()} = {s.name} ({_heading_arrow(s.heading)})"
-        )
-    return "\n".join(lines)
+    # auto-fit a one-off viewport to the fleet; crowded cells show ship counts
+    view = Viewport(width, height)
+    view.fit(ships)
+    return MapRenderer(view).render(game)
 
 
 def create_demo_game():
@@ -154,6 +70,10 @@ def show_menu(show_map: bool):
     print("5) Quit")
     print(f"6) Toggle mini-map [{'ON' if show_map else 'OFF'}]")
     print("7) Load shot (1 AP)")
+    print("8) Squadron order (1 AP per ship)")
+    print("9) Undo")
+    print("10) Redo")
+    print("11) Branch points (mark/goto/compare)")
 
 
 def pick_ship(game):
@@ -181,6 +101,8 @@ def handle_turn_ship(game):
         return
     try:
         desired = float(input("Desired new heading (0-359): ").strip())
+        if not math.isfinite(desired):
+            raise ValueError(desired)
     except Exception:
         print("Invalid heading.")
         return
@@ -245,6 +167,8 @@ def main_loop():
 
     print("=== Wooden Ships (Inspired) - Milestone 1 Prototype ===")
     show_map = True
+    # One squadron per nation, led by whichever ship gives the order
+    squadrons = {}
     while True:
         # Start of turn: reset AP for all living ships
         game.start_turn()
@@ -254,6 +178,8 @@ def main_loop():
         configured = set()
         # Track mini-map rendering per active ship (show once per activation)
         shown_map_for_ship = None
+        # Undo/redo covers this turn's actions (AP resets at the next turn)
+        history = History()
 
         def set_sails(ship: Ship):
             cur = ship.sail_setting
@@ -272,6 +198,8 @@ def main_loop():
         def do_turn(ship: Ship):
             try:
                 desired = float(input("Desired new heading (0-359): ").strip())
+                if not math.isfinite(desired):
+                    raise ValueError(desired)
             except Exception:
                 print("Invalid heading.")
                 return False
@@ -336,6 +264,73 @@ def main_loop():
             print(result)
             return True
 
+        def do_squadron(ship: Ship):
+            members = [ship] + [s for s in game.living_ships()
+                                if s.nation == ship.nation and s is not ship]
+            sq = squadrons.get(ship.nation)
+            if sq is None or sq.ships != members:
+                sq = squadrons[ship.nation] = Squadron(members)
+            order = input("Order [ahead/abreast/follow/together/succession]: ").strip().lower()
+            if order == "ahead":
+                report = sq.line_ahead(game)
+            elif order == "abreast":
+                report = sq.line_abreast(game)
+            elif order == "follow":
+                report = sq.follow_leader(game)
+            elif order in ("together", "succession"):
+                try:
+                    heading = float(input("New heading (0-359): ").strip())
+                    if not math.isfinite(heading):
+                        raise ValueError(heading)
+                except Exception:
+                    print("Invalid heading.")
+                    return
+                if order == "together":
+                    report = sq.turn_together(game, heading)
+                else:
+                    report = sq.turn_in_succession(game, heading)
+            else:
+                print("Unknown order.")
+                return
+            counts = {}
+            for _, action, _ in report:
+                counts[action] = counts.get(action, 0) + 1
+            summary = ", ".join(f"{n} {a}" for a, n in sorted(counts.items())) or "no ship could act"
+            print(f"Squadron of {len(members)} led by {ship.name}: {summary}.")
+
+        def do_branches():
+            cmd = input("Branch points [mark/goto/compare/list]: ").strip().lower()
+            if cmd == "list":
+                for name in history.branches:
+                    print(f"- {name}")
+                if not history.branches:
+                    print("No branch points yet.")
+            elif cmd == "mark":
+                name = input("Name this point: ").strip()
+                if name:
+                    history.mark(name)
+                    print(f"Marked '{name}'.")
+            elif cmd == "goto":
+                name = input("Go to: ").strip()
+                if name not in history.branches:
+                    print("No such branch point.")
+                    return
+                history.checkout(name)
+                print(f"Now at '{name}'.")
+            elif cmd == "compare":
+                a = input("First: ").strip()
+                b = input("Second: ").strip()
+                if a not in history.branches or b not in history.branches:
+                    print("No such branch point.")
+                    return
+                diffs = history.compare(a, b)
+                for (name, field), (va, vb) in diffs.items():
+                    print(f"{name} {field}: {va} | {vb}")
+                if not diffs:
+                    print("No differences.")
+            else:
+                print("Unknown option.")
+
         # Activation loop: keep going until all AP are spent
         while True:
             living = game.living_ships()
@@ -374,23 +369,31 @@ def main_loop():
                         if current.ap <= 0:
                             print("No AP left to change sails.")
                         else:
-                            set_sails(current)
-                            current.ap = max(0, current.ap - 1)
+                            with history.record("sails", [(current, SAIL_FIELDS)]):
+                                set_sails(current)
+                                current.ap = max(0, current.ap - 1)
                             print(f"AP spent to change sails. AP now {current.ap}/{current.ap_max}.")
                 configured.add(current)
 
             show_menu(show_map)
             choice = input("Select action: ").strip()
 
-            spent = False
             if choice == "1":
-                spent = do_turn(current)
+                with history.record("turn", [(current, TURN_FIELDS)]):
+                    if do_turn(current):
+                        current.ap = max(0, current.ap - 1)
             elif choice == "2":
-                spent = do_move(current)
+                with history.record("move", [(current, MOVE_FIELDS)]):
+                    if do_move(current):
+                        current.ap = max(0, current.ap - 1)
             elif choice == "3":
-                spent = do_fire(current)
+                # defender is picked inside do_fire, so watch every ship
+                with history.record("fire", [(s, FIRE_FIELDS) for s in game.ships]):
+                    if do_fire(current):
+                        current.ap = max(0, current.ap - 1)
             elif choice == "4":
-                current.ap = 0
+                with history.record("end activation", [(current, ("ap",))]):
+                    current.ap = 0
                 print(f"Ending activation for {current.name}.")
             elif choice == "5":
                 print("Exiting game.")
@@ -402,13 +405,24 @@ def main_loop():
                     # Force re-render on next loop
                     shown_map_for_ship = None
             elif choice == "7":
-                spent = do_load(current)
+                with history.record("load", [(current, LOAD_FIELDS)]):
+                    if do_load(current):
+                        current.ap = max(0, current.ap - 1)
+            elif choice == "8":
+                with history.record("squadron",
+                                    [(s, SQUADRON_FIELDS) for s in game.living_ships()]):
+                    do_squadron(current)  # spends each member's AP itself
+            elif choice == "9":
+                label = history.undo()
+                print(f"Undid {label}." if label else "Nothing to undo.")
+            elif choice == "10":
+                label = history.redo()
+                print(f"Redid {label}." if label else "Nothing to redo.")
+            elif choice == "11":
+                do_branches()
             else:
                 print("Unknown option.")
 
-            if spent:
-                current.ap = max(0, current.ap - 1)
-
             # Victory check mid-turn
             victor = game.check_victory()
             if victor:
@@ -420,4 +434,19 @@ def main_loop():
 
 
 if __name__ == "__main__":
-    main_loop()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Wooden Ships (Inspired)")
+    parser.add_argument("--realtime", action="store_true",
+                        help="advance the battle on a timer instead of per command")
+    parser.add_argument("--tick-rate", type=float, default=1.0,
+                        help="real-time mode: simulation ticks per second")
+    parser.add_argument("--fps", type=float, default=10.0,
+                        help="real-time mode: maximum map redraws per second")
+    args = parser.parse_args()
+
+    if args.realtime:
+        from realtime import RealTimeGame
+        RealTimeGame(create_demo_game(), tick_rate=args.tick_rate, fps=args.fps).run()
+    else:
+        main_loop()
@@ -0,0 +1,286 @@
+import asyncio
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from actions import turn_ship, move_ship, fire_broadside
+from render import Viewport, MapRenderer, CSI
+
+# REAL-TIME MODE
+#
+# Three coroutines share one GameState:
+#   simulate - steps every ship at a fixed tick rate (one game turn per tick)
+#   read_input - queues typed commands without blocking the loop
+#   draw - redraws changed map rows at up to `fps` frames per second
+# Terminal writes run on a worker thread. If the previous frame is still being
+# written, draw skips the frame instead of waiting, so a slow terminal never
+# holds up a tick.
+
+HELP = ("<n> turn <hdg> | <n> sails battle|full | <n> load round|chain|double | "
+        "<n> fire <m> [port|starboard] | pan <dx> <dy> | zoom <f> | quit")
+
+
+class Timings:
+    """Count / mean / max of a stream of durations, in seconds."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def summary(self) -> str:
+        if not self.count:
+            return "n/a"
+        mean = self.total / self.count
+        return f"mean {mean * 1000:.2f} ms, max {self.worst * 1000:.2f} ms over {self.count}"
+
+
+class RealTimeGame:
+    def __init__(self, game, tick_rate: float = 1.0, fps: float = 10.0,
+                 out=None, inp=None):
+        self.game = game
+        self.tick = 1.0 / tick_rate
+        self.frame = 1.0 / fps
+        self.out = out or sys.stdout
+        self.inp = inp or sys.stdin
+
+        self.view = Viewport(61, 21, scale=1.0)
+        self.view.fit(game.ships, pad=8.0)
+        self.renderer = MapRenderer(self.view, top=1)
+        self.status = []            # status lines last drawn below the map
+
+        self.commands = None        # asyncio.Queue, made inside the loop
+        self.log = deque(maxlen=3)  # recent command results
+        self.running = True
+        self.result = None
+
+        self.tick_times = Timings()
+        self.render_times = Timings()   # frame built -> written to terminal
+        self.late_ticks = 0
+        self.frames_drawn = 0
+        self.frames_skipped = 0
+
+    # -- simulation --
+
+    def apply(self, line: str):
+        """Carry out one typed command; returns a message for the log."""
+        parts = line.split()
+        if not parts:
+            return None
+        if parts[0] in ("q", "quit"):
+            self.running = False
+            return "Exiting game."
+        try:
+            if parts[0] == "pan":
+                dx, dy = float(parts[1]), float(parts[2])
+                if not (math.isfinite(dx) and math.isfinite(dy)):
+                    raise ValueError(line)
+                self.view.pan(dx, dy)
+                return "View panned."
+            if parts[0] == "zoom":
+                factor = float(parts[1])
+                # must stay a usable, unmirrored scale
+                if not (math.isfinite(factor) and factor > 0):
+                    raise ValueError(line)
+                self.view.zoom(factor)
+                return "View zoomed."
+            ship = self.game.ships[int(parts[0])]
+            verb, args = parts[1], parts[2:]
+        except (IndexError, ValueError):
+            return f"Bad command: {line!r}. {HELP}"
+
+        if ship not in self.game.living_ships():
+            return f"{ship.name} cannot act."
+        if ship.ap <= 0:
+            return f"{ship.name} has no AP left this tick."
+
+        try:
+            if verb == "turn":
+                change = turn_ship(ship, float(args[0]))
+                msg = f"{ship.name} turned {change:.1f} deg."
+            elif verb == "sails" and args[0] in ("battle", "full"):
+                ship.sail_setting = args[0]
+                msg = f"{ship.name} sails: {ship.sail_setting}."
+            elif verb == "load" and args[0] in ("round", "chain", "double"):
+                ship.ammo_type = ship.loaded_ammo = args[0]
+                msg = f"{ship.name} loaded {ship.loaded_ammo}."
+            elif verb == "fire":
+                target = self.game.ships[int(args[0])]
+                if target is ship:
+                    return "Invalid target."
+                if ship.loaded_ammo is None:
+                    return f"{ship.name}'s guns are unloaded."
+                side = args[1] if len(args) > 1 else None
+                msg = fire_broadside(ship, target, preferred_side=side).replace("\n", " ")
+            else:
+                return f"Bad command: {line!r}. {HELP}"
+        except (IndexError, ValueError):
+            return f"Bad command: {line!r}. {HELP}"
+
+        ship.ap = max(0, ship.ap - 1)
+        return msg
+
+    def step(self):
+        """One tick: reset AP, apply queued commands, then every ship sails on."""
+        game = self.game
+        game.start_turn()
+        while not self.commands.empty():
+            msg = self.apply(self.commands.get_nowait())
+            if msg:
+                self.log.append(msg)
+        for s in game.living_ships():
+            if s.ap > 0:
+                move_ship(s, game)
+                s.ap -= 1
+        self.result = game.check_victory()
+        if self.result:
+            self.running = False
+        else:
+            game.turn_number += 1
+
+    async def simulate(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while self.running:
+            t0 = time.perf_counter()
+            self.step()
+            self.tick_times.add(time.perf_counter() - t0)
+            deadline += self.tick
+            delay = deadline - loop.time()
+            if delay < 0:
+                # fell behind: count it and re-anchor rather than burst-catching up
+                self.late_ticks += 1
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
+
+    # -- input --
+
+    async def read_input(self):
+        loop = asyncio.get_running_loop()
+
+        def on_line(line):
+            if line == "":       # EOF: keep simulating, stop listening
+                return False
+            self.commands.put_nowait(line.strip())
+            return True
+
+        try:
+            fd = self.inp.fileno()
+            encoding = getattr(self.inp, "encoding", None) or "utf-8"
+            pending = bytearray()
+
+            # read raw bytes: a buffered readline() takes one line per wakeup
+            # and strands the rest in the stream's buffer until more arrives
+            def readable():
+                chunk = os.read(fd, 4096)
+                if not chunk:
+                    loop.remove_reader(fd)
+                    if pending:
+                        on_line(pending.decode(encoding, "replace"))
+                    return
+                pending.extend(chunk)
+                *lines, rest = pending.split(b"\n")
+                pending[:] = rest
+                for line in lines:
+                    on_line(line.decode(encoding, "replace"))
+
+            loop.add_reader(fd, readable)
+        except (NotImplementedError, AttributeError, OSError, ValueError):
+            # no selector support for this stream (e.g. Windows console):
+            # read on a daemon thread so a pending readline never blocks exit
+            def pump():
+                while True:
+                    line = self.inp.readline()
+                    loop.call_soon_threadsafe(on_line, line)
+                    if line == "":
+                        return
+
+            threading.Thread(target=pump, daemon=True).start()
+            fd = None
+
+        try:
+            while self.running:
+                await asyncio.sleep(self.tick)
+        finally:
+            if fd is not None:
+                loop.remove_reader(fd)
+
+    # -- rendering --
+
+    def _status_lines(self):
+        game = self.game
+        lines = [f"Turn {game.turn_number} | tick {self.tick * 1000:.0f} ms | "
+                 f"late ticks {self.late_ticks} | frames {self.frames_drawn} "
+                 f"(skipped {self.frames_skipped})"]
+        for i, s in enumerate(game.ships):
+            state = "SUNK" if s.is_sunk() else ("SURRENDERED" if s.surrendered else "")
+            lines.append(f"{i}) {s.name} hdg {s.heading:.0f} Hull {s.hull:.1f} "
+                         f"Rig {s.rigging:.1f} Crew {int(round(s.crew))} "
+                         f"Ammo {s.loaded_ammo or 'Unloaded'} {state}")
+        lines.extend(self.log)
+        lines.append(HELP)
+        return lines
+
+    def _compose(self):
+        data = self.renderer.diff(self.game)
+        top = self.view.height + 4
+        lines = self._status_lines()
+        for i, line in enumerate(lines):
+            if i >= len(self.status) or self.status[i] != line:
+                data += f"{CSI}{top + i};1H{line}{CSI}K"
+        self.status = lines
+        return data
+
+    def _write(self, data: str):
+        self.out.write(data)
+        self.out.flush()
+
+    async def draw(self):
+        loop = asyncio.get_running_loop()
+        pending = None
+        await loop.run_in_executor(None, self._write, f"{CSI}2J")
+        while self.running:
+            if pending is not None and not pending.done():
+                self.frames_skipped += 1
+            else:
+                t0 = time.perf_counter()
+                data = self._compose()
+                if data:
+                    pending = loop.run_in_executor(None, self._write, data)
+                    pending.add_done_callback(
+                        lambda _f, t0=t0: self.render_times.add(time.perf_counter() - t0))
+                self.frames_drawn += 1
+            await asyncio.sleep(self.frame)
+        if pending is not None:
+            await pending
+        self._write(self._compose())
+
+    # -- entry point --
+
+    async def _run(self):
+        self.commands = asyncio.Queue()
+        await asyncio.gather(self.simulate(), self.read_input(), self.draw())
+
+    def run(self):
+        asyncio.run(self._run())
+        bottom = self.view.height + 5 + len(self.status)
+        self._write(f"{CSI}{bottom};1H\n")
+        if self.result:
+            print(f"*** {self.result} ***")
+        print(self.report())
+
+    def report(self) -> str:
+        return "\n".join([
+            f"Tick duration:  {self.tick_times.summary()} (late ticks {self.late_ticks})",
+            f"Render latency: {self.render_times.summary()}",
+            f"Frames: {self.frames_drawn} drawn, {self.frames_skipped} skipped",
+        ])
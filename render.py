@@ -0,0 +1,257 @@
+# ASCII MAP RENDERING
+#
+# Viewport maps world coordinates onto a fixed grid of character cells and can
+# be panned, zoomed or fitted to a set of ships. MapRenderer keeps the cell
+# occupancy from the previous frame, so after ships move it rebuilds only the
+# rows they left or entered. diff() emits just those rows with ANSI cursor
+# moves, and learns which ships moved from the GameState rather than by
+# rescanning the fleet.
+
+CSI = "\x1b["
+
+
+def heading_arrow(deg: float) -> str:
+    d = deg % 360
+    if 337.5 <= d or d < 22.5:
+        return ">"
+    if 22.5 <= d < 67.5:
+        return "/"
+    if 67.5 <= d < 112.5:
+        return "^"
+    if 112.5 <= d < 157.5:
+        return "\\"
+    if 157.5 <= d < 202.5:
+        return "<"
+    if 202.5 <= d < 247.5:
+        return "/"
+    if 247.5 <= d < 292.5:
+        return "v"
+    return "\\"
+
+
+def heading_offset(deg: float):
+    """(row, col) step toward the cell a ship heading `deg` points at."""
+    d = deg % 360
+    if 337.5 <= d or d < 22.5:   # E
+        return (0, 1)
+    if 22.5 <= d < 67.5:         # NE
+        return (-1, 1)
+    if 67.5 <= d < 112.5:        # N
+        return (-1, 0)
+    if 112.5 <= d < 157.5:       # NW
+        return (-1, -1)
+    if 157.5 <= d < 202.5:       # W
+        return (0, -1)
+    if 202.5 <= d < 247.5:       # SW
+        return (1, -1)
+    if 247.5 <= d < 292.5:       # S
+        return (1, 0)
+    return (1, 1)                 # SE
+
+
+def cluster_symbol(ships) -> str:
+    """A lone ship shows its initial; a group shows its size (# for 10+)."""
+    if len(ships) == 1:
+        return ships[0].name[0].upper()
+    return str(len(ships)) if len(ships) < 10 else "#"
+
+
+class Viewport:
+    """
+    A width x height window onto the sea, centred on (cx, cy).
+    scale_x / scale_y are map units per column / row; terminal cells are
+    about twice as tall as wide, so rows cover twice the distance by default.
+    """
+
+    def __init__(self, width: int = 31, height: int = 15,
+                 cx: float = 0.0, cy: float = 0.0, scale: float = 1.0):
+        self.width = width
+        self.height = height
+        self.cx = cx
+        self.cy = cy
+        self.scale_x = scale
+        self.scale_y = scale * 2
+        # bumped on every pan/zoom/fit so renderers know to start over
+        self.version = 0
+
+    def cell(self, x: float, y: float):
+        """(row, col) of a world point, or None if it is outside the view."""
+        col = int(round((x - self.cx) / self.scale_x + (self.width - 1) / 2))
+        row = int(round((self.cy - y) / self.scale_y + (self.height - 1) / 2))
+        if 0 <= row < self.height and 0 <= col < self.width:
+            return (row, col)
+        return None
+
+    def pan(self, dx: float, dy: float):
+        self.cx += dx
+        self.cy += dy
+        self.version += 1
+
+    def zoom(self, factor: float):
+        """factor > 1 zooms in (fewer map units per cell)."""
+        self.scale_x /= factor
+        self.scale_y /= factor
+        self.version += 1
+
+    def fit(self, ships, pad: float = 1.0):
+        """Centre on ships and stretch each axis so all of them fit."""
+        min_x = min(s.x for s in ships) - pad
+        max_x = max(s.x for s in ships) + pad
+        min_y = min(s.y for s in ships) - pad
+        max_y = max(s.y for s in ships) + pad
+        self.cx = (min_x + max_x) / 2
+        self.cy = (min_y + max_y) / 2
+        self.scale_x = max(1e-6, max_x - min_x) / max(1, self.width - 1)
+        self.scale_y = max(1e-6, max_y - min_y) / max(1, self.height - 1)
+        self.version += 1
+
+
+class MapRenderer:
+    """
+    Draws ships through a Viewport, clustering ships that share a cell.
+
+    update() compares each ship it is given with its (cell, arrow) last time;
+    rows are rebuilt and emitted only where that changed. diff() registers the
+    renderer in game.watchers and afterwards only re-checks the ships in
+    `touched` (those whose position, heading or status was written since the
+    last frame), so the cost of a frame tracks the ships that moved rather
+    than fleet size. A pan/zoom or a different game means one full rescan.
+    """
+
+    def __init__(self, viewport: Viewport, top: int = 1):
+        self.viewport = viewport
+        self.top = top              # terminal row of the frame's first line
+        self._version = None
+        self._game = None           # game whose watchers we are in
+        self.touched = set()        # ships written since the last diff()
+        self._reset()
+
+    def _reset(self):
+        self.where = {}             # ship -> (row, col, arrow)
+        self.by_row = {}            # row -> {col: [ships]}
+        self.lines = None           # last frame sent by diff()
+        self.dirty = set(range(self.viewport.height))
+        self._version = self.viewport.version
+
+    # -- occupancy --
+
+    def _remove(self, ship):
+        row, col, _ = self.where.pop(ship)
+        cells = self.by_row[row]
+        cells[col].remove(ship)
+        if not cells[col]:
+            del cells[col]
+        self.dirty.update((row - 1, row, row + 1))
+
+    def _place(self, ship, row, col, arrow):
+        self.where[ship] = (row, col, arrow)
+        self.by_row.setdefault(row, {}).setdefault(col, []).append(ship)
+        self.dirty.update((row - 1, row, row + 1))
+
+    def _sync(self, s, living=True):
+        cell = self.viewport.cell(s.x, s.y) if living else None
+        key = None if cell is None else (cell[0], cell[1], heading_arrow(s.heading))
+        old = self.where.get(s)
+        if old == key:
+            return
+        if old is not None:
+            self._remove(s)
+        if key is not None:
+            self._place(s, *key)
+
+    def _check_view(self):
+        """Start over (keeping the last frame for diffing) after a pan/zoom."""
+        if self._version == self.viewport.version:
+            return False
+        lines = self.lines
+        self._reset()
+        self.lines = lines
+        return True
+
+    def update(self, ships):
+        """Sync with the ships currently on the sea (e.g. game.living_ships())."""
+        self._check_view()
+        seen = set()
+        for s in ships:
+            seen.add(s)
+            self._sync(s)
+        for s in [s for s in self.where if s not in seen]:
+            self._remove(s)
+
+    def update_touched(self, game):
+        """
+        Sync with game using only the ships it reported as touched; falls back
+        to a full update() the first time, after a pan/zoom, or for a new game.
+        """
+        if self._game is not game:
+            if self._game is not None:
+                self._game.watchers.discard(self)
+            game.watchers.add(self)
+            self._game = game
+            self._version = None
+        if self._check_view():
+            self.touched.clear()
+            self.update(game.living_ships())
+            return
+        touched, self.touched = self.touched, set()
+        for s in touched:
+            self._sync(s, s.alive and not s.surrendered and not s.is_sunk())
+
+    # -- drawing --
+
+    def _row(self, r: int) -> str:
+        width = self.viewport.width
+        line = [" "] * width
+        occupied = self.by_row.get(r, {})
+        # heading arrows from lone ships in this and the neighbouring rows
+        for rr in (r - 1, r, r + 1):
+            cells = self.by_row.get(rr, {})
+            for col in sorted(cells):
+                if len(cells[col]) != 1:
+                    continue
+                s = cells[col][0]
+                dr, dc = heading_offset(s.heading)
+                ac = col + dc
+                if rr + dr == r and 0 <= ac < width and ac not in occupied and line[ac] == " ":
+                    line[ac] = self.where[s][2]
+        for col, ships in occupied.items():
+            line[col] = cluster_symbol(ships)
+        return "|" + "".join(line) + "|"
+
+    def frame(self, game):
+        """All lines of the map (header and borders included), no legend."""
+        border = "+" + ("-" * self.viewport.width) + "+"
+        rows = [self._row(r) for r in range(self.viewport.height)]
+        self.dirty.clear()
+        return [f"Wind from {game.wind_dir} deg", border] + rows + [border]
+
+    def render(self, game, legend: bool = True) -> str:
+        """Full plain-text frame, for scrolling console output."""
+        ships = game.living_ships() or game.ships
+        self.update(ships)
+        lines = self.frame(game)
+        if legend:
+            for s in ships:
+                if s in self.where:
+                    lines.append(f" {s.name[0].upper()} = {s.name} ({self.where[s][2]})")
+        return "\n".join(lines)
+
+    def diff(self, game) -> str:
+        """
+        ANSI escape output that brings the screen from the last frame to the
+        current one, rewriting only rows that changed. "" if nothing did.
+        """
+        self.update_touched(game)
+        if self.lines is None or len(self.lines) != self.viewport.height + 3:
+            new = self.frame(game)
+            changed = range(len(new))
+        else:
+            new = list(self.lines)
+            new[0] = f"Wind from {game.wind_dir} deg"
+            for r in self.dirty:
+                if 0 <= r < self.viewport.height:
+                    new[r + 2] = self._row(r)
+            self.dirty.clear()
+            changed = [i for i, line in enumerate(new) if line != self.lines[i]]
+        self.lines = new
+        return "".join(f"{CSI}{self.top + i};1H{new[i]}{CSI}K" for i in changed)
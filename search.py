@@ -0,0 +1,51 @@
+from actions import turn_ship, move_ship
+from zobrist import TranspositionTable
+
+# SEARCH / PLANNING
+
+
+def reachable_states(game, ship, depth=None, table=None):
+    """
+    Explore every turn/move sequence `ship` can make with `depth` AP
+    (default: its remaining AP) and return {zhash: (x, y, heading)} for each
+    distinct resulting state.
+
+    Sequences that land on the same quantized state (e.g. turn-then-move vs
+    move-then-turn) share a Zobrist hash, so the transposition table cuts
+    their subtrees off after the first visit. The ship is restored afterwards.
+    """
+    if depth is None:
+        depth = ship.ap
+    if table is None:
+        table = TranspositionTable()
+    table.new_search()
+
+    found = {}
+    start = (ship.x, ship.y, ship.heading, ship.ap)
+
+    def visit(remaining):
+        key = game.zhash
+        if table.probe(key, remaining) is not None:
+            return
+        table.store(key, remaining, True)
+        found[key] = (ship.x, ship.y, ship.heading)
+        if remaining <= 0:
+            return
+
+        x, y, heading = ship.x, ship.y, ship.heading
+        for step in (ship.handling, -ship.handling):
+            turn_ship(ship, heading + step)
+            ship.ap -= 1
+            visit(remaining - 1)
+            ship.heading = heading
+            ship.ap += 1
+
+        move_ship(ship, game)
+        ship.ap -= 1
+        visit(remaining - 1)
+        ship.x, ship.y = x, y
+        ship.ap += 1
+
+    visit(depth)
+    ship.x, ship.y, ship.heading, ship.ap = start
+    return found
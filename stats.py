@@ -0,0 +1,247 @@
+import math
+
+# STREAMING STATISTICS
+#
+# For batch / Monte Carlo runs: feed each finished GameState to
+# BattleStats.add() and drop it. Every metric keeps a running mean/variance
+# (Welford) and a log-bucketed quantile sketch, both fixed-size, so memory does
+# not grow with the number of games. Partial results from worker processes
+# combine with merge(), which gives the same counts and buckets as feeding
+# every game to one collector (means/variances agree up to float rounding):
+#
+#     def worker(n):
+#         stats = BattleStats()
+#         for _ in range(n):
+#             stats.add(play_one_battle())
+#         return stats                      # pickles back to the parent
+#
+#     total = BattleStats()
+#     for part in pool.map(worker, chunks):
+#         total.merge(part)
+#     print(total.summary())
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of numbers."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0           # sum of squared deviations from the mean
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, x: float):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = min(self.min, x)
+        self.max = max(self.max, x)
+
+    def merge(self, other: "RunningStats"):
+        if other.count == 0:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+
+class QuantileSketch:
+    """
+    Approximate quantiles of non-negative values within `relative_accuracy`.
+
+    Values are counted in logarithmic buckets (bucket k holds values in
+    (gamma^(k-1), gamma^k]), so the buckets needed depend on the range of the
+    data, not on how much of it there is. If more than `max_buckets` are
+    needed, the lowest ones are folded together. Merging adds bucket counts,
+    which is exact.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}       # k -> count
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, x: float, n: int = 1):
+        if x < 0:
+            raise ValueError(f"QuantileSketch takes values >= 0, got {x}")
+        self.count += n
+        if x == 0:
+            self.zeros += n
+            return
+        k = math.ceil(math.log(x) / self.log_gamma)
+        self.buckets[k] = self.buckets.get(k, 0) + n
+        self._collapse()
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different accuracy")
+        self.count += other.count
+        self.zeros += other.zeros
+        for k, n in other.buckets.items():
+            self.buckets[k] = self.buckets.get(k, 0) + n
+        self._collapse()
+
+    def _collapse(self):
+        if len(self.buckets) <= self.max_buckets:
+            return
+        keys = sorted(self.buckets)
+        spill = len(keys) - self.max_buckets
+        folded = sum(self.buckets.pop(k) for k in keys[:spill])
+        self.buckets[keys[spill]] += folded
+
+    def _value(self, k) -> float:
+        # midpoint (in relative terms) of bucket k
+        return 2 * self.gamma ** k / (self.gamma + 1)
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                return self._value(k)
+        return self._value(max(self.buckets))
+
+    def histogram(self, bins: int = 10, lo: float = None, hi: float = None):
+        """Regroup the sketch into `bins` equal-width bins: [(start, end, count)]."""
+        points = [(0.0, self.zeros)] if self.zeros else []
+        points += [(self._value(k), n) for k, n in sorted(self.buckets.items())]
+        if not points:
+            return []
+        lo = points[0][0] if lo is None else lo
+        hi = points[-1][0] if hi is None else hi
+        width = (hi - lo) / bins or 1.0
+        counts = [0] * bins
+        for v, n in points:
+            counts[min(bins - 1, max(0, int((v - lo) / width)))] += n
+        return [(lo + i * width, lo + (i + 1) * width, c) for i, c in enumerate(counts)]
+
+
+class Metric:
+    """RunningStats + QuantileSketch for one quantity."""
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.stats = RunningStats()
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, x: float):
+        self.stats.add(x)
+        self.sketch.add(x)
+
+    def merge(self, other: "Metric"):
+        self.stats.merge(other.stats)
+        self.sketch.merge(other.sketch)
+
+    def quantile(self, q: float) -> float:
+        # bucket midpoints can overshoot the data slightly; clamp to what we saw
+        return min(self.stats.max, max(self.stats.min, self.sketch.quantile(q)))
+
+    def histogram(self, bins: int = 10):
+        return self.sketch.histogram(bins, self.stats.min, self.stats.max)
+
+    def to_dict(self) -> dict:
+        s = self.stats
+        return {
+            "count": s.count, "mean": s.mean, "stdev": s.stdev,
+            "min": s.min, "p50": self.quantile(0.5), "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99), "max": s.max,
+        }
+
+
+class BattleStats:
+    """
+    Outcome statistics over many finished battles, per nation.
+
+    Per game and nation: hull_remaining (fraction of total hull_max),
+    crew_losses, broadsides_fired and surrender_rate (share of that nation's
+    ships that struck). Per game: turns (turn number when the battle was
+    decided). Outcomes are counted exactly.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.games = 0
+        self.outcomes = {}      # "<nation> wins" / "mutual destruction" / "undecided" -> count
+        self.metrics = {}       # (nation or "all", metric name) -> Metric
+
+    def _metric(self, scope, name) -> Metric:
+        key = (scope, name)
+        if key not in self.metrics:
+            self.metrics[key] = Metric(self.relative_accuracy)
+        return self.metrics[key]
+
+    def add(self, game):
+        """Record one finished GameState. Nothing from it is kept."""
+        self.games += 1
+        fleets = {}
+        for s in game.ships:
+            fleets.setdefault(s.nation, []).append(s)
+
+        afloat = [n for n, ships in fleets.items()
+                  if any(s.alive and not s.surrendered and not s.is_sunk() for s in ships)]
+        if len(afloat) == 1:
+            outcome = f"{afloat[0]} wins"
+            self._metric("all", "turns").add(game.turn_number)
+        elif not afloat:
+            outcome = "mutual destruction"
+            self._metric("all", "turns").add(game.turn_number)
+        else:
+            outcome = "undecided"
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+        for nation, ships in fleets.items():
+            self._metric(nation, "hull_remaining").add(
+                sum(s.hull for s in ships) / sum(s.hull_max for s in ships))
+            self._metric(nation, "crew_losses").add(sum(s.crew_max - s.crew for s in ships))
+            self._metric(nation, "broadsides_fired").add(sum(s.broadsides_fired for s in ships))
+            self._metric(nation, "surrender_rate").add(
+                sum(1 for s in ships if s.surrendered) / len(ships))
+
+    def merge(self, other: "BattleStats"):
+        """Fold in a partial collector, e.g. one returned by a worker process."""
+        self.games += other.games
+        for outcome, n in other.outcomes.items():
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + n
+        for (scope, name), metric in other.metrics.items():
+            self._metric(scope, name).merge(metric)
+
+    def to_dict(self) -> dict:
+        """Summary as plain data (e.g. for json.dump)."""
+        nested = {}
+        for (scope, name), metric in sorted(self.metrics.items()):
+            nested.setdefault(scope, {})[name] = metric.to_dict()
+        return {"games": self.games, "outcomes": dict(self.outcomes), "metrics": nested}
+
+    def summary(self) -> str:
+        lines = [f"--- {self.games} games ---"]
+        for outcome, n in sorted(self.outcomes.items()):
+            lines.append(f"{outcome}: {n} ({n / self.games:.1%})")
+        lines.append(f"{'':32} {'mean':>9} {'stdev':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}")
+        for (scope, name), metric in sorted(self.metrics.items()):
+            d = metric.to_dict()
+            lines.append(
+                f"{scope + ' ' + name:32} {d['mean']:9.2f} {d['stdev']:9.2f} {d['p50']:9.2f} "
+                f"{d['p90']:9.2f} {d['p99']:9.2f} {d['max']:9.2f}")
+        return "\n".join(lines)
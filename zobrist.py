@@ -0,0 +1,194 @@
+import math
+
+# -----------------
+# Zobrist hashing
+# -----------------
+#
+# Every (ship slot, field, quantized value) triple maps to a fixed 64-bit key,
+# packed into one integer and spread with splitmix64 (no tables, no caches).
+# A GameState hash is the XOR of the keys of all its ship fields plus the turn,
+# so changing one field only needs two XORs: take out the old key (each Ship
+# keeps its current ones in _zkeys), put in the new.
+# Ship.__setattr__ and GameState.turn_number do that bookkeeping, which means
+# turn_ship, move_ship and fire_broadside keep the hash current in O(1).
+
+POS_QUANTUM = 0.5       # map units per x/y bucket
+HEADING_QUANTUM = 5.0   # degrees per heading bucket
+DAMAGE_BUCKETS = 10     # hull/rigging/crew are hashed as tenths of max
+
+# Ship attributes that take part in the hash
+SHIP_FIELDS = frozenset((
+    "x", "y", "heading",
+    "hull", "rigging", "crew",
+    "sail_setting", "ammo_type", "loaded_ammo",
+    "alive", "surrendered",
+    "ap",
+))
+
+_MASK = (1 << 64) - 1
+
+# Small integer codes so every (slot, field, bucket) packs into one int
+_FIELD_CODES = {f: i for i, f in enumerate(sorted(SHIP_FIELDS), start=1)}
+_TURN_CODE = 0
+# every value the string-valued fields (sail_setting, ammo_type, loaded_ammo) take
+_VALUE_CODES = {None: 0, "battle": 1, "full": 2, "round": 3, "chain": 4, "double": 5}
+_HEADING_BUCKETS = int(360 / HEADING_QUANTUM)
+
+
+def _mix(z: int) -> int:
+    """splitmix64 finalizer: a cheap, well-spread 64-bit integer hash."""
+    z = (z + 0x9E3779B97F4A7C15) & _MASK
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK
+    return z ^ (z >> 31)
+
+
+def _key(slot: int, field_code: int, bucket: int) -> int:
+    """64-bit key for one (slot, field, bucket); same across runs."""
+    return _mix((slot + 1) << 40 | field_code << 32 | (bucket & 0xFFFFFFFF))
+
+
+def _code(value) -> int:
+    try:
+        return _VALUE_CODES[value]
+    except KeyError:
+        raise ValueError(f"no Zobrist code for {value!r}") from None
+
+
+def _damage(top_field):
+    def q(ship, value):
+        top = ship.__dict__[top_field]
+        return math.floor(value / top * DAMAGE_BUCKETS) if top else 0
+    return q
+
+
+def _position(ship, value):
+    return math.floor(value / POS_QUANTUM + 0.5)
+
+
+def _heading(ship, value):
+    return math.floor((value % 360) / HEADING_QUANTUM + 0.5) % _HEADING_BUCKETS
+
+
+def _coded(ship, value):
+    return _code(value)
+
+
+def _as_int(ship, value):
+    return int(value)
+
+
+_QUANTIZERS = {
+    "x": _position,
+    "y": _position,
+    "heading": _heading,
+    "hull": _damage("hull_max"),
+    "rigging": _damage("rigging_max"),
+    "crew": _damage("crew_max"),
+    "sail_setting": _coded,
+    "ammo_type": _coded,
+    "loaded_ammo": _coded,
+    "alive": _as_int,
+    "surrendered": _as_int,
+    "ap": _as_int,
+}
+
+
+def quantize(ship, field, value):
+    """Bucket a raw field value so near-identical states hash the same."""
+    return _QUANTIZERS[field](ship, value)
+
+
+def _field_keyer(field):
+    shifted, q = _FIELD_CODES[field] << 32, _QUANTIZERS[field]
+
+    # _key with the field part folded in ahead of time
+    def keyer(ship, value):
+        return _mix((ship.slot + 1) << 40 | shifted | (q(ship, value) & 0xFFFFFFFF))
+    return keyer
+
+
+# field -> keyer(ship, value); Ship.__setattr__ calls these directly
+FIELD_KEYERS = {f: _field_keyer(f) for f in SHIP_FIELDS}
+
+
+def field_key(ship, field, value) -> int:
+    return FIELD_KEYERS[field](ship, value)
+
+
+def field_keys(ship) -> dict:
+    """Current key of every hashed field of ship (kept on Ship as _zkeys)."""
+    return {f: field_key(ship, f, getattr(ship, f)) for f in SHIP_FIELDS}
+
+
+def ship_key(ship) -> int:
+    h = 0
+    for key in field_keys(ship).values():
+        h ^= key
+    return h
+
+
+def turn_key(turn_number) -> int:
+    return _key(-1, _TURN_CODE, turn_number)
+
+
+def hash_state(game) -> int:
+    """Full (non-incremental) hash; used to seed GameState.zhash and to verify it."""
+    h = turn_key(game.turn_number)
+    for s in game.ships:
+        h ^= ship_key(s)
+    return h
+
+
+# -----------------
+# Transposition table
+# -----------------
+
+class TranspositionTable:
+    """
+    Fixed-size hash -> result cache for search.
+
+    Each hash maps to one slot (hash % capacity), so memory never grows past
+    `capacity` entries. A new result replaces the one in its slot if it was
+    searched at least as deep, or if the old one is left over from an earlier
+    search (see new_search).
+    """
+
+    def __init__(self, capacity: int = 1 << 16):
+        self.capacity = capacity
+        self.slots = [None] * capacity   # (key, depth, value, generation)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def new_search(self):
+        """Age existing entries so the next search may overwrite them freely."""
+        self.generation += 1
+
+    def probe(self, key, depth=0):
+        """
+        Return the stored value for key if it was searched at least `depth`
+        deep during the current search, else None. Entries left over from an
+        earlier search count as misses.
+        """
+        entry = self.slots[key % self.capacity]
+        if (entry is not None and entry[0] == key and entry[1] >= depth
+                and entry[3] == self.generation):
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, value):
+        idx = key % self.capacity
+        entry = self.slots[idx]
+        if entry is None or entry[3] != self.generation or depth >= entry[1]:
+            self.slots[idx] = (key, depth, value, self.generation)
+
+    def clear(self):
+        self.slots = [None] * self.capacity
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return sum(1 for e in self.slots if e is not None)